@@ -7,7 +7,9 @@ setup(
     license="MIT",
     description="The official API wrapper for the teahaz server",
     long_description="TBA",
-    install_requires=["requests", "cryptography"],
+    python_requires=">=3.10",
+    install_requires=["requests", "orjson", "cryptography"],
+    extras_require={"async": ["httpx[http2]"]},
     url="https://github.com/bczsalba/teahaz.py",
     author="BcZsalba",
     author_email="bczsalba@gmail.com",
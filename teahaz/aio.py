@@ -0,0 +1,359 @@
+"""
+teahaz.aio
+----------------
+author: bczsalba
+
+
+Asyncio versions of the main objects, using `httpx` for transport
+
+Note: This module needs the `async` extra, e.g. `pip install teahaz.py[async]`.
+"""
+
+# pylint: disable=too-many-instance-attributes
+
+from __future__ import annotations
+
+import asyncio
+from inspect import isawaitable
+from time import time as epoch
+from typing import Any, Optional, Union
+
+import httpx
+import orjson
+
+from .base import Event, Channel, Message, BaseChatroom
+from .client import EventCallback
+
+__all__ = [
+    "AsyncTeacup",
+    "AsyncChatroom",
+]
+
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+def _create_client(max_connections: int = DEFAULT_MAX_CONNECTIONS) -> httpx.AsyncClient:
+    """Create an HTTP/2 capable client with a pool of `max_connections` connections"""
+
+    return httpx.AsyncClient(
+        http2=True, limits=httpx.Limits(max_connections=max_connections)
+    )
+
+
+class AsyncChatroom(BaseChatroom):
+    """A Chatroom that does its I/O on an asyncio event loop
+
+    Listener callbacks may be plain functions or coroutine functions."""
+
+    # httpx takes raw request bodies as `content`
+    _body_key = "content"
+
+    def __init__(
+        self,
+        url: str,
+        uid: Optional[str] = None,
+        name: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        """Initialize object"""
+
+        super().__init__(url, uid, name)
+
+        self.client = client or _create_client()
+
+        self._task: Optional[asyncio.Task] = None
+        self._is_stopped: bool = False
+
+    async def _request(self, method_name: str, **req_args: Any) -> Optional[Any]:
+        """Handle internal request, deal with error event calling"""
+
+        try:
+            response = await self.client.request(method_name.upper(), **req_args)
+        except Exception as exception:
+            if self._listeners[Event.NETWORK_EXCEPTION.value] is not None:
+                await self._notify(
+                    Event.NETWORK_EXCEPTION, exception, method_name, req_args
+                )
+                return None
+
+            raise exception
+
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+
+        if self._listeners[Event.ERROR.value] is not None:
+            await self._notify(Event.ERROR, response, method_name, req_args)
+            return None
+
+        raise self._unhandled_error(response, method_name, req_args)
+
+    async def _notify(self, event: Event, *data: Any) -> None:
+        """Notify listener of event, awaiting it if it is a coroutine function"""
+
+        callback = self._listeners[event.value]
+        if callback is None:
+            return
+
+        result = callback(*data)
+        if isawaitable(result):
+            await result
+
+    async def _poll(self) -> None:
+        """Get new messages of the active channel, notify listeners about them"""
+
+        if self.active_channel is None:
+            return
+
+        since_args = self._poll_args(self.active_channel.uid)
+
+        if not self._channels_due():
+            message_data = await self._request("get", **since_args)
+
+        else:
+            message_data, channel_data = await asyncio.gather(
+                self._request("get", **since_args),
+                self._request("get", **self._get_channels_args()),
+            )
+
+            if channel_data is not None:
+                self._update_channels_from_data(channel_data)
+
+        if message_data is None:
+            return
+
+        for event, message in self._collect_messages(message_data):
+            await self._notify(event, message)
+
+    async def _loop(self) -> None:
+        """The main event loop for a chatroom"""
+
+        while not self._is_stopped:
+            await self._poll()
+            await asyncio.sleep(self.interval)
+
+    def _run(self) -> None:
+        """Run monitoring loop as a task on the running event loop"""
+
+        self._message_ids = {msg.uid for msg in self.messages}
+        self._last_get_time = epoch()
+        self._task = asyncio.create_task(self._loop())
+        self._task.add_done_callback(self._report_exception)
+
+    def _report_exception(self, task: asyncio.Task) -> None:
+        """Stop polling & report the exception if the loop's task raised"""
+
+        if task.cancelled() or task.exception() is None:
+            return
+
+        self._is_stopped = True
+        task.get_loop().call_exception_handler(
+            {
+                "message": f'Exception while polling AsyncChatroom(uid="{self.uid}")',
+                "exception": task.exception(),
+                "task": task,
+            }
+        )
+
+    async def _get_messages(
+        self,
+        method: str,
+        channel: Optional[Channel] = None,
+        count: Optional[str] = None,
+        time: Optional[str] = None,
+    ) -> Optional[list[Message]]:
+        """Get messages by time (since) or count"""
+
+        channel_uid = self._resolve_channel(channel).uid
+        messages = await self._request(
+            "get", **self._get_messages_args(method, channel_uid, count, time)
+        )
+
+        if messages is None:
+            # Getting messages failed, but error was captured
+            return None
+
+        return [Message.from_dict(message) for message in messages]
+
+    def subscribe(self, event: Event, callback: EventCallback) -> None:
+        """Listen for event and run callback
+
+        Note: Subscribing to message events starts polling, so this
+        has to be called while an event loop is running."""
+
+        self._set_listener(event, callback)
+
+        if self._task is None and not event in [Event.ERROR, Event.NETWORK_EXCEPTION]:
+            self._run()
+
+    def stop(self) -> None:
+        """Stop event loop"""
+
+        self._is_stopped = True
+
+        if self._task is not None:
+            self._task.cancel()
+
+    async def create(self, username: str, password: str) -> Optional[AsyncChatroom]:
+        """Create chatroom on the server"""
+
+        response = await self._request("post", **self._create_args(username, password))
+
+        if response is None:
+            # Creation did not succeed, but error was captured
+            return None
+
+        self._initialize_from_response(response)
+        return self
+
+    async def create_channel(self, name: str) -> Optional[Channel]:
+        """Create a channel"""
+
+        response = await self._request("post", **self._create_channel_args(name))
+
+        if response is None:
+            # Creation of channel failed, but error was captured
+            return None
+
+        channel = Channel.from_dict(response)
+        self._merge_channels([channel])
+
+        return channel
+
+    async def get_channels(self) -> Optional[list[Channel]]:
+        """Get all channels the logged-in user has access to"""
+
+        channels = await self._request("get", **self._get_channels_args())
+
+        if channels is None:
+            # Getting channels failed, but error was captured
+            return None
+
+        return [Channel.from_dict(channel) for channel in channels]
+
+    async def login(self, user_id: str, password: str) -> Optional[Any]:
+        """Log into the chatroom with given credentials
+
+        Temporary: user_id will be replaced with username"""
+
+        response = await self._request("post", **self._login_args(user_id, password))
+
+        self.user_id = user_id
+
+        channels = await self.get_channels()
+        if channels is not None:
+            self._merge_channels(channels)
+
+        return response
+
+    async def get_since(
+        self, since: float, channel: Optional[Channel] = None
+    ) -> Optional[list[Message]]:
+        """Get messages since epoch timestamp
+
+        Note: This method is limited to getting 100 messages at a time,
+        and should NOT be used for anything that can overload that."""
+
+        return await self._get_messages("since", channel, time=str(since))
+
+    async def get_count(
+        self,
+        count: int,
+        channel: Optional[Channel] = None,
+        before: Optional[float] = None,
+    ) -> Optional[list[Message]]:
+        """Get `count` messages, optionally only ones sent before epoch timestamp `before`"""
+
+        return await self._get_messages(
+            "count",
+            channel,
+            str(count),
+            None if before is None else str(before),
+        )
+
+    async def send(
+        self,
+        content: Union[str, bytes],
+        channel: Optional[Channel] = None,
+        reply_id: Optional[str] = None,
+    ) -> Optional[Any]:
+        """Send a message
+
+        The message type is detected automatically, so sending files & text
+        is done through the same method."""
+
+        return await self._request(
+            "post", **self._send_args(content, channel, reply_id)
+        )
+
+
+class AsyncTeacup:
+    """A Teacup of AsyncChatrooms, all sharing one HTTP/2 client"""
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS) -> None:
+        """Initialize object"""
+
+        self.chatrooms: list[AsyncChatroom] = []
+        self._global_listeners: dict[Event, EventCallback] = {}
+        self._client = _create_client(max_connections)
+
+    async def login(
+        self, username: str, password: str, chatroom: str, url: str
+    ) -> AsyncChatroom:
+        """Create a logged-in chatroom instance"""
+
+        chat = AsyncChatroom(url=url, uid=chatroom, client=self._client)
+
+        for event, callback in self._global_listeners.items():
+            chat.subscribe(event, callback)
+
+        await chat.login(username, password)
+        self.chatrooms.append(chat)
+
+        return chat
+
+    async def create_chatroom(
+        self, url: str, name: str, username: str, password: str
+    ) -> Optional[AsyncChatroom]:
+        """Create a new chatroom with given user as its owner, return a logged-in instance"""
+
+        chat = AsyncChatroom(url=url, name=name, client=self._client)
+
+        # Subscribe chatroom to all global events we are subscribed to
+        for event, callback in self._global_listeners.items():
+            chat.subscribe(event, callback)
+
+        if await chat.create(username, password) is None:
+            # Creation failed, but error was captured
+            return None
+
+        self.chatrooms.append(chat)
+        return chat
+
+    def get_chatroom(self, name: str) -> Optional[AsyncChatroom]:
+        """Get first chatroom by matching name"""
+
+        for chatroom in self.chatrooms:
+            if chatroom.name == name:
+                return chatroom
+
+        return None
+
+    def subscribe_all(self, event: Event, callback: EventCallback) -> None:
+        """Subscribe callback to event in all (current & future) AsyncChatrooms"""
+
+        for chatroom in self.chatrooms:
+            chatroom.subscribe(event, callback)
+
+        self._global_listeners[event] = callback
+
+    def stop(self) -> None:
+        """Stop all chatroom tasks"""
+
+        for chatroom in self.chatrooms:
+            chatroom.stop()
+
+    async def close(self) -> None:
+        """Stop all chatroom tasks, close the shared client"""
+
+        self.stop()
+        await self._client.aclose()
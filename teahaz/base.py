@@ -0,0 +1,420 @@
+"""
+teahaz.base
+----------------
+author: bczsalba
+
+
+The I/O-free objects shared by the blocking & the asyncio clients
+"""
+
+# pylint: disable=too-many-instance-attributes
+
+from __future__ import annotations
+
+from enum import Enum, auto
+from types import MappingProxyType
+from time import time as epoch
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Union, Optional
+
+import orjson
+
+if TYPE_CHECKING:
+    from .client import EventCallback
+
+__all__ = [
+    "Event",
+    "Channel",
+    "Message",
+    "BaseChatroom",
+    "EndpointContainer",
+]
+
+
+class Event(Enum):
+    """Events that `Chatroom` and `Teacup` can subscribe to"""
+
+    ERROR = auto()
+    MSG_NEW = auto()
+    MSG_DEL = auto()
+    MSG_SYS = auto()
+    MSG_SENT = auto()
+    USER_JOIN = auto()
+    USER_LEAVE = auto()
+    SERVER_INFO = auto()
+    MSG_SYS_SILENT = auto()
+    NETWORK_EXCEPTION = auto()
+
+
+# Headers of requests with a JSON body, shared & read-only so no request can alter them
+_JSON_HEADERS = MappingProxyType({"Content-Type": "application/json"})
+
+# Events emitted for message types, anything else is `Event.MSG_NEW`
+_TYPE_EVENT = {
+    "delete": Event.MSG_DEL,
+    "system": Event.MSG_SYS,
+    "system-silent": Event.MSG_SYS_SILENT,
+}
+
+
+class EndpointContainer:  # pylint: disable=too-few-public-methods
+    """Endpoints of the Teahaz API"""
+
+    _items = {
+        "base": "{url}/api/v0",
+        "login": "{base}/login/{chatroom_id}",
+        "chatroom": "{base}/chatroom",
+        "files": "{base}/files/{chatroom_id}",
+        "messages": "{base}/messages/{chatroom_id}",
+        "channels": "{base}/channels/{chatroom_id}",
+        "invites": "{base}/invites/{chatroom_id}",
+    }
+
+    # Set for every key of `_items` by `_rebuild`
+    base: str
+    login: str
+    chatroom: str
+    files: str
+    messages: str
+    channels: str
+    invites: str
+
+    def __init__(self, url: str, uid: Optional[str] = None) -> None:
+        """Create object"""
+
+        self._url = url
+        self._uid = uid
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Format every endpoint with the current url & uid
+
+        The results are stored as instance attributes, so reading an
+        endpoint is a plain attribute lookup."""
+
+        base = self._items["base"].format(url=self._url)
+        self.__dict__.update(
+            {
+                key: template.format(url=self._url, base=base, chatroom_id=self._uid)
+                for key, template in self._items.items()
+            }
+        )
+
+    def set(self, item: str, value: str) -> None:
+        """Set normally private argument"""
+
+        item = "_" + item
+        if not item in dir(self):
+            raise KeyError(f"Invalid setter key {item}.")
+
+        setattr(self, item, value)
+        self._rebuild()
+
+
+@dataclass(slots=True, frozen=True)
+class Message:
+    """A dataclass to store messages
+
+    Note: This is only meant to be used internally."""
+
+    uid: str
+    channel_id: str
+    user_id: str
+    key_id: str
+    send_time: float
+    message_type: str
+    data: Union[str, bytes]
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Message:
+        """Create Message from server-data"""
+
+        return cls(
+            uid=data["messageID"],
+            channel_id=data["channelID"],
+            user_id=data["userID"],
+            key_id=data["keyID"],
+            send_time=data["send_time"],
+            message_type=data["type"],
+            data=data["data"],
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class Channel:
+    """A dataclass to store channels
+
+    Note: This is only meant to be used internally."""
+
+    uid: str
+    name: str
+    public: bool
+    # permissions: dict[str, bool]
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Channel:
+        """Create Channel from server-data"""
+
+        return cls(
+            uid=data["channelID"],
+            name=data["channel_name"],
+            public=data["public"],
+            # permissions=data["permissions"],
+        )
+
+
+class BaseChatroom:  # pylint: disable=too-few-public-methods
+    """The I/O-free parts of a chatroom, shared by `Chatroom` & `AsyncChatroom`
+
+    Subclasses do the requests, this only builds their arguments
+    and keeps track of the chatroom's state."""
+
+    # Keyword argument the transport takes a raw request body as
+    _body_key = "data"
+
+    def __init__(
+        self, url: str, uid: Optional[str] = None, name: Optional[str] = None
+    ) -> None:
+        """Initialize object"""
+
+        self.uid = uid
+        self.url = url
+        self.name = name
+        self.interval: float = 1
+        self.channel_interval: int = 10
+
+        self.user_id: Optional[str] = None
+        self.active_channel: Optional[Channel] = None
+
+        # If the chatroom doesn't exist yet its endpoints' uid
+        # is only filled in the create() method
+        self.endpoints = EndpointContainer(self.url, self.uid)
+
+        self.messages: list[Message] = []
+
+        self._message_ids: set[str] = set()
+        self._channels_by_uid: dict[str, Channel] = {}
+        # Indexed by Event.value, so lookups don't need to hash the event.
+        # This is never mutated, only replaced, so the polling thread can read
+        # it without locking while another thread subscribes.
+        self._listeners: tuple[Optional[EventCallback], ...] = (None,) * (
+            max(event.value for event in Event) + 1
+        )
+        self._last_get_time: float = epoch()
+        self._polls_until_channels: int = self.channel_interval
+
+    @property
+    def channels(self) -> list[Channel]:
+        """Get channels available to the user, in the order they were found"""
+
+        return list(self._channels_by_uid.values())
+
+    def _set_listener(self, event: Event, callback: EventCallback) -> None:
+        """Replace the listener of event"""
+
+        listeners = list(self._listeners)
+        listeners[event.value] = callback
+        self._listeners = tuple(listeners)
+
+    def _unhandled_error(
+        self, response: Any, method_name: str, req_args: dict[str, Any]
+    ) -> RuntimeError:
+        """Get the error raised for a failed response without an ERROR handler"""
+
+        return RuntimeError(
+            f"{method_name.upper()} request with data {req_args} failed"
+            f" with no error or exception handler: {response.status_code} -> {response.text}"
+        )
+
+    def _initialize_from_response(self, response: dict) -> None:
+        """Initialize data of chatroom from a response dict"""
+
+        self.name = response["chatroom_name"]
+        self.uid = response["chatroomID"]
+        self.user_id = response["userID"]
+
+        assert self.uid is not None
+        self.endpoints.set("uid", self.uid)
+
+        self._update_channels_from_data(response["channels"])
+
+    def _channels_due(self) -> bool:
+        """Count a poll, return whether it should also refresh the channels
+
+        Channels don't change often, so they are only refreshed
+        every `channel_interval`-th poll, alongside the messages."""
+
+        self._polls_until_channels -= 1
+        if self._polls_until_channels > 0:
+            return False
+
+        self._polls_until_channels = self.channel_interval
+        return True
+
+    def _merge_channels(self, channels: list[Channel]) -> None:
+        """Add channels not yet known, activate the first one if none is active"""
+
+        existing = self._channels_by_uid
+        existing.update(
+            {
+                channel.uid: channel
+                for channel in channels
+                if channel.uid not in existing
+            }
+        )
+
+        if self.active_channel is None and len(existing) > 0:
+            self.active_channel = next(iter(existing.values()))
+
+    def _update_channels_from_data(self, channels: list[dict[str, Any]]) -> None:
+        """Update channels from server-data, only converting ones not yet known"""
+
+        from_dict = Channel.from_dict
+        existing = self._channels_by_uid
+
+        self._merge_channels(
+            [from_dict(data) for data in channels if data["channelID"] not in existing]
+        )
+
+    def _collect_messages(
+        self, message_data: list[dict[str, Any]]
+    ) -> list[tuple[Event, Message]]:
+        """Store the messages not seen before, get them with the events they emit"""
+
+        messages = [Message.from_dict(message) for message in message_data]
+
+        # there is no good way to type these
+        messages.sort(key=lambda msg: msg.send_time)
+
+        new = []
+        for message in messages:
+            # This is needed to avoid duplicates
+            if message.uid in self._message_ids:
+                continue
+
+            self.messages.append(message)
+            self._message_ids.add(message.uid)
+
+            new.append((_TYPE_EVENT.get(message.message_type, Event.MSG_NEW), message))
+
+        return new
+
+    def _resolve_channel(self, channel: Optional[Channel] = None) -> Channel:
+        """Get channel to use, setting it as the active one if given"""
+
+        if channel is not None:
+            self.active_channel = channel
+
+        elif self.active_channel is None:
+            raise ValueError(
+                f"Please use either the {type(self).__name__}.set_channel() function"
+                + " or provide `channel` as a non-null value!"
+            )
+
+        else:
+            channel = self.active_channel
+
+        return channel
+
+    def _get_messages_args(
+        self,
+        method: str,
+        channel_uid: str,
+        count: Optional[str] = None,
+        time: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Get request arguments for getting messages by time (since) or count"""
+
+        headers = {
+            "get-method": method,
+            "userID": self.user_id,
+            "channelID": channel_uid,
+        }
+
+        if count is not None:
+            headers["count"] = count
+
+        if time is not None:
+            headers["time"] = time
+
+        return {"url": self.endpoints.messages, "headers": headers}
+
+    def _poll_args(self, channel_uid: str) -> dict[str, Any]:
+        """Get request arguments for the messages sent since the previous poll"""
+
+        # We need to assign to a temporary
+        # variable, otherwise messages can
+        # get stuck between setting & getting.
+        previous = self._last_get_time
+        self._last_get_time = epoch()
+
+        return self._get_messages_args("since", channel_uid, time=str(previous))
+
+    def _get_channels_args(self) -> dict[str, Any]:
+        """Get request arguments for getting channels"""
+
+        return {"url": self.endpoints.channels, "headers": {"userID": self.user_id}}
+
+    def _json_args(self, url: str, data: dict[str, Any]) -> dict[str, Any]:
+        """Get request arguments for sending data as a JSON body"""
+
+        return {
+            "url": url,
+            "headers": _JSON_HEADERS,
+            self._body_key: orjson.dumps(data),
+        }
+
+    def _create_args(self, username: str, password: str) -> dict[str, Any]:
+        """Get request arguments for creating the chatroom"""
+
+        data = {
+            "chatroom_name": self.name,
+            "username": username,
+            "password": password,
+        }
+
+        return self._json_args(self.endpoints.chatroom, data)
+
+    def _create_channel_args(self, name: str) -> dict[str, Any]:
+        """Get request arguments for creating a channel"""
+
+        data = {
+            "userID": self.user_id,
+            "channel_name": name,
+        }
+
+        return self._json_args(self.endpoints.channels, data)
+
+    def _login_args(self, user_id: str, password: str) -> dict[str, Any]:
+        """Get request arguments for logging in"""
+
+        data = {
+            "userID": user_id,
+            "password": password,
+        }
+
+        return self._json_args(self.endpoints.login, data)
+
+    def _send_args(
+        self,
+        content: Union[str, bytes],
+        channel: Optional[Channel] = None,
+        reply_id: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Get request arguments for sending a message"""
+
+        channel = self._resolve_channel(channel)
+
+        if isinstance(content, bytes):
+            endpoint = self.endpoints.files
+        else:
+            endpoint = self.endpoints.messages
+
+        msg = {
+            "userID": self.user_id,
+            "channelID": channel.uid,
+            "replyID": reply_id,
+            "data": content,
+        }
+
+        return self._json_args(endpoint, msg)
@@ -11,13 +11,20 @@ The module containing the main objects for the Teahaz API wrapper
 
 from __future__ import annotations
 
-from enum import Enum, auto
-from time import sleep, time as epoch
-from threading import Thread
-from dataclasses import dataclass
+import threading
+from time import monotonic, time as epoch
+from threading import Thread, Event as ThreadEvent, current_thread
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
 from typing import Callable, Any, Union, Optional
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .base import Event, Channel, Message, BaseChatroom
 
 __all__ = [
     "Event",
@@ -32,115 +39,46 @@ ErrorCallback = Callable[[requests.Response, str, dict[str, Any]], Any]
 ExceptionCallback = Callable[[Exception, str, dict[str, Any]], Any]
 EventCallback = Union[MessageCallback, ErrorCallback]
 
+# Seconds to wait for a connection, or a (connect, read) pair, see `requests`
+RequestTimeout = Union[float, tuple[float, float]]
 
-class Event(Enum):
-    """Events that `Chatroom` and `Teacup` can subscribe to"""
-
-    ERROR = auto()
-    MSG_NEW = auto()
-    MSG_DEL = auto()
-    MSG_SYS = auto()
-    MSG_SENT = auto()
-    USER_JOIN = auto()
-    USER_LEAVE = auto()
-    SERVER_INFO = auto()
-    MSG_SYS_SILENT = auto()
-    NETWORK_EXCEPTION = auto()
-
-
-class EndpointContainer:
-    """Endpoints of the Teahaz API"""
-
-    _items = {
-        "base": "{url}/api/v0",
-        "login": "{base}/login/{chatroom_id}",
-        "chatroom": "{base}/chatroom",
-        "files": "{base}/files/{chatroom_id}",
-        "messages": "{base}/messages/{chatroom_id}",
-        "channels": "{base}/channels/{chatroom_id}",
-        "invites": "{base}/invites/{chatroom_id}",
-    }
-
-    def __init__(self, url: str, uid: Optional[str] = None) -> None:
-        """Create object"""
-
-        self._url = url
-        self._uid = uid
-
-    def set(self, item: str, value: str) -> None:
-        """Set normally private argument"""
-
-        item = "_" + item
-        if not item in dir(self):
-            raise KeyError(f"Invalid setter key {item}.")
-
-        setattr(self, item, value)
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_TIMEOUT: RequestTimeout = (5, 10)
+DEFAULT_MAX_WORKERS = 8
 
-    def __getattr__(self, item: str) -> str:
-        """Get attribute"""
+# A poll issues at most two requests at once, see `Chatroom._request_many`
+POLL_WORKERS = 2
 
-        # this would recurse
-        if item == "base":
-            return self._items["base"].format(url=self._url)
 
-        return self._items[item].format(
-            url=self._url, base=self.base, chatroom_id=self._uid
-        )
-
-
-@dataclass
-class Message:
-    """A dataclass to store messages
-
-    Note: This is only meant to be used internally."""
-
-    uid: str
-    channel_id: str
-    user_id: str
-    key_id: str
-    send_time: float
-    message_type: str
-    data: Union[str, bytes]
-
-    @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> Message:
-        """Create Message from server-data"""
+class _UncachedResult(Exception):
+    """Raised by cached requests that failed, so their result isn't stored"""
 
-        return cls(
-            uid=data["messageID"],
-            channel_id=data["channelID"],
-            user_id=data["userID"],
-            key_id=data["keyID"],
-            send_time=data["send_time"],
-            message_type=data["type"],
-            data=data["data"],
-        )
 
+def _create_session(pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> requests.Session:
+    """Create a session with a connection pool of `pool_maxsize` connections
 
-@dataclass
-class Channel:
-    """A dataclass to store channels
+    Transient failures of idempotent requests are retried with backoff by urllib3.
+    POST is not retried, as that could e.g. send a message twice."""
 
-    Note: This is only meant to be used internally."""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
 
-    uid: str
-    name: str
-    public: bool
-    # permissions: dict[str, bool]
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry
+    )
 
-    @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> Channel:
-        """Create Channel from server-data"""
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
 
-        return cls(
-            uid=data["channelID"],
-            name=data["channel_name"],
-            public=data["public"],
-            # permissions=data["permissions"],
-        )
+    return session
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class User:
     """A dataclass to store users
 
@@ -148,12 +86,20 @@ class User:
 
     uid: str
     username: str
-    color: dict[str, int]
+    color: dict[str, int] = field(hash=False)
+    color_markup: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Compute color_markup, as the user's color doesn't change"""
+
+        object.__setattr__(
+            self, "color_markup", ";".join(map(str, self.color.values()))
+        )
 
     def get_color(self) -> str:
         """Get user's color as markup tag"""
 
-        return ";".join(str(value) for value in self.color.values())
+        return self.color_markup
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> User:
@@ -191,159 +137,269 @@ class Invite:
         )
 
 
-class Chatroom:
+class Chatroom(BaseChatroom):
     """TODO"""
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         url: str,
         uid: Optional[str] = None,
         name: Optional[str] = None,
         session: Optional[requests.Session] = None,
+        *,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeout: RequestTimeout = DEFAULT_TIMEOUT,
+        teacup: Optional[Teacup] = None,
     ) -> None:
-        """Initialize object"""
+        """Initialize object
 
-        self.uid = uid
-        self.url = url
-        self.name = name
-        self.interval = 1
+        `pool_maxsize` sets the connection pool size of the session
+        created when none is given, `timeout` limits how long every
+        request may wait for the server. When `teacup` is given, the chatroom
+        is polled by its scheduler instead of a thread of its own."""
 
-        self.user_id: Optional[str] = None
-        self.session = session or requests.Session()
-        self.active_channel: Optional[Channel] = None
-        self.channels: list[Channel] = []
+        super().__init__(url, uid, name)
 
-        self.event_thread = Thread(target=self._loop)
+        self.max_interval: float = 8
 
-        # If the chatroom doesn't exist yet its endpoints' uid
-        # is only filled in the create() method
-        self.endpoints = EndpointContainer(self.url, self.uid)
+        self.session = session or _create_session(pool_maxsize)
+        self._get_history = lru_cache(maxsize=256)(self._fetch_history)
+        # requests never times out by default, and a hung request would
+        # block every chatroom polled by the same Teacup scheduler.
+        self._methods: dict[str, Callable[..., requests.Response]] = {
+            name: partial(getattr(self.session, name), timeout=timeout)
+            for name in ("get", "post", "put", "delete", "patch")
+        }
 
-        self.messages: list[Message] = []
+        self.event_thread = Thread(target=self._loop)
+        self._teacup = teacup
+
+        # Chatrooms of a Teacup are woken up through its scheduler,
+        # and share its executor for concurrent requests.
+        # pylint: disable=protected-access
+        if teacup is None:
+            self._wake = ThreadEvent()
+            self._executor = ThreadPoolExecutor(max_workers=POLL_WORKERS)
+        else:
+            self._wake = teacup._wake
+            self._executor = teacup._poll_executor
+        # pylint: enable=protected-access
 
-        self._listeners: dict[Event, EventCallback] = {}
+        self._delay: float = self.interval
+        self._next_poll: float = 0.0
+        self._wake_pending: bool = False
         self._is_looping: bool = False
-        self._is_stopped: bool = False
+        self._stop = ThreadEvent()
         self._is_server_side: bool = False
-        self._last_get_time: float = epoch()
 
-    def _request(self, method_name: str, **req_args: Any) -> Optional[Any]:
-        """Handle internal request, deal with error event calling
+    def _get(self, **req_args: Any) -> Optional[Any]:
+        """Handle internal GET request, deal with error event calling"""
 
-        The type: ignore-s are because mypy thinks the methods called
-        will get a self argument, but they won't."""
+        return self._send(self._methods["get"], "get", req_args)
 
-        method = getattr(self.session, method_name)
-        if method is None:
-            raise ValueError(f'Session does not have a method for "{method_name}".')
+    def _post(self, **req_args: Any) -> Optional[Any]:
+        """Handle internal POST request, deal with error event calling"""
 
-        error_handler = self._listeners.get(Event.ERROR)
-        exception_handler = self._listeners.get(Event.NETWORK_EXCEPTION)
+        return self._send(self._methods["post"], "post", req_args)
+
+    def _send(
+        self,
+        method: Callable[..., requests.Response],
+        method_name: str,
+        req_args: dict[str, Any],
+    ) -> Optional[Any]:
+        """Send request using bound session method, deal with error event calling"""
 
         try:
             response = method(**req_args)
-        except Exception as exception:
-            # This should just raise a custom Exception.
-            if exception_handler is not None:
-                exception_handler(exception, method_name, req_args)  # type: ignore
+        except Exception as exception:  # pylint: disable=broad-except
+            self._handle_exception(exception, method_name, req_args)
 
-                # maybe this could return CapturedException/CapturedError?
-                return None
+            # maybe this could return CapturedException/CapturedError?
+            return None
+
+        return self._handle_response(response, method_name, req_args)
+
+    def _handle_exception(
+        self, exception: Exception, method_name: str, req_args: dict[str, Any]
+    ) -> None:
+        """Call the NETWORK_EXCEPTION handler with exception, raise it without one
+
+        The type: ignore-s are because mypy thinks the methods called
+        will get a self argument, but they won't."""
 
+        exception_handler = self._listeners[Event.NETWORK_EXCEPTION.value]
+
+        # This should just raise a custom Exception.
+        if exception_handler is None:
             raise exception
 
+        exception_handler(exception, method_name, req_args)  # type: ignore
+
+    def _handle_response(
+        self, response: requests.Response, method_name: str, req_args: dict[str, Any]
+    ) -> Optional[Any]:
+        """Get data of a successful response, call the ERROR handler otherwise"""
+
         if response.status_code == 200:
-            return response.json()
+            # orjson is much faster than the stdlib json used by response.json()
+            return orjson.loads(response.content)
 
+        error_handler = self._listeners[Event.ERROR.value]
         if error_handler is not None:
             error_handler(response, method_name, req_args)  # type: ignore
 
             # maybe this could return CapturedError?
             return None
 
-        raise RuntimeError(
-            f"{method_name.upper()} request with data {req_args} failed"
-            f" with no error or exception handler: {response.status_code} -> {response.text}"
-        )
+        raise self._unhandled_error(response, method_name, req_args)
+
+    def _request_many(
+        self, calls: list[tuple[str, dict[str, Any]]]
+    ) -> list[Optional[Any]]:
+        """Issue (method_name, req_args) requests concurrently over the session's pool
+
+        Only the requests run on the executor, their results & errors are
+        handled on the calling thread, in the order of `calls`."""
+
+        futures = []
+        for method_name, req_args in calls:
+            method = self._methods.get(method_name)
+            if method is None:
+                raise ValueError(f'Session does not have a method for "{method_name}".')
+
+            futures.append(self._executor.submit(method, **req_args))
+
+        return [
+            self._handle_future(future, method_name, req_args)
+            for (method_name, req_args), future in zip(calls, futures)
+        ]
+
+    def _handle_future(
+        self,
+        future: Future[requests.Response],
+        method_name: str,
+        req_args: dict[str, Any],
+    ) -> Optional[Any]:
+        """Handle the outcome of a request submitted by `_request_many`"""
+
+        try:
+            response = future.result()
+        except Exception as exception:  # pylint: disable=broad-except
+            self._handle_exception(exception, method_name, req_args)
+            return None
+
+        return self._handle_response(response, method_name, req_args)
 
     def _notify(self, event: Event, *data: Any) -> None:
         """Notify listener of event"""
 
-        callback = self._listeners.get(event)
+        callback = self._listeners[event.value]
         if callback is None:
             return
 
         callback(*data)
 
-    def _loop(self) -> None:
-        """The main event loop for a chatroom"""
+    def _poll_once(self) -> Optional[int]:
+        """Get new messages of the active channel, notify listeners about them
 
-        ids = [msg.uid for msg in self.messages]
-        self._last_get_time = epoch()
+        Returns the number of new messages, or None if no request was made
+        because the chatroom is stopped or has no active channel."""
 
-        while not self._is_stopped:
-            if self.active_channel is None:
-                sleep(self.interval)
-                continue
+        # Wake-ups from here on need another poll, see `_backoff`
+        self._wake_pending = False
 
-            # We need to assign to a temporary
-            # variable, otherwise messages can
-            # get stuck between setting & getting.
-            previous = self._last_get_time
-            self._last_get_time = epoch()
-            messages = self.get_since(previous)
+        if self._stop.is_set() or self.active_channel is None:
+            return None
+
+        since_args = self._poll_args(self.active_channel.uid)
+
+        if not self._channels_due():
+            message_data = self._get(**since_args)
 
-            if messages is not None:
-                # there is no good way to type these
-                messages.sort(key=lambda msg: msg.send_time)
+        else:
+            message_data, channel_data = self._request_many(
+                [("get", since_args), ("get", self._get_channels_args())]
+            )
 
-                for message in messages:
-                    # This is needed to avoid duplicates
-                    if message.uid in ids:
-                        continue
+            if channel_data is not None:
+                self._update_channels_from_data(channel_data)
 
-                    self.messages.append(message)
-                    ids.append(message.uid)
+        if message_data is None:
+            return 0
 
-                    if message.message_type == "delete":
-                        self._notify(Event.MSG_DEL, message)
+        new = self._collect_messages(message_data)
+        for event, message in new:
+            if event is Event.MSG_DEL:
+                self._get_history.cache_clear()
 
-                    elif message.message_type == "system":
-                        self._notify(Event.MSG_SYS, message)
+            self._notify(event, message)
 
-                    elif message.message_type == "system-silent":
-                        self._notify(Event.MSG_SYS_SILENT, message)
+        return len(new)
+
+    def _backoff(self, new_count: Optional[int]) -> None:
+        """Set the delay until the next poll
+
+        Idle polls double the delay up to `max_interval`, new messages
+        reset it to `interval`. Polls that made no request keep it as-is.
+        A wake-up that arrived during the poll makes the next one immediate."""
+
+        if self._wake_pending:
+            self._delay = self.interval
+            self._next_poll = 0.0
+            return
 
-                    else:
-                        self._notify(Event.MSG_NEW, message)
+        if new_count == 0:
+            self._delay = min(self.max_interval, self._delay * 2)
 
-            sleep(self.interval)
+        elif new_count is not None:
+            self._delay = self.interval
+
+        self._next_poll = monotonic() + self._delay
+
+    def _wake_up(self) -> None:
+        """Poll as soon as possible, with the delay reset to `interval`"""
+
+        self._wake_pending = True
+        self._delay = self.interval
+        self._next_poll = 0.0
+        self._wake.set()
+
+    def _loop(self) -> None:
+        """The main event loop for a chatroom not owned by a Teacup"""
+
+        while not self._stop.is_set():
+            self._wake.clear()
+            self._backoff(self._poll_once())
+            self._wake.wait(self._delay)
 
     def _run(self) -> None:
-        """Run monitoring loop"""
+        """Run monitoring loop
+
+        Chatrooms owned by a Teacup are polled by its scheduler thread,
+        others start their own event thread."""
 
         self._is_looping = True
+        self._message_ids = {msg.uid for msg in self.messages}
+        self._last_get_time = epoch()
+        self._delay = self.interval
+
+        if self._teacup is not None:
+            self._teacup._register(self)  # pylint: disable=protected-access
+            return
+
         self.event_thread.start()
         self._update_thread_name()
 
     def _initialize_from_response(self, response: dict) -> None:
         """Initialize data of chatroom from a response dict"""
 
-        self.name = response["chatroom_name"]
-        self.uid = response["chatroomID"]
-        self.user_id = response["userID"]
-
-        assert self.uid is not None
-        self.endpoints.set("uid", self.uid)
+        super()._initialize_from_response(response)
         self._update_thread_name()
-
-        self._update_channels(
-            [Channel.from_dict(channel) for channel in response["channels"]]
-        )
         self._is_server_side = True
 
     def _update_channels(self, channels: Optional[list[Channel]] = None) -> None:
-        """Update channels available to the user"""
+        """Update channels available to the user, getting them if not given"""
 
         assert self.user_id, "Please log in before getting channels!"
 
@@ -352,12 +408,7 @@ class Chatroom:
             if channels is None:
                 return
 
-        for channel in channels:
-            if channel not in self.channels:
-                self.channels.append(channel)
-
-        if self.active_channel is None and len(self.channels) > 0:
-            self.active_channel = self.channels[0]
+        self._merge_channels(channels)
 
     def _update_thread_name(self) -> None:
         """Set self.event_thread.name"""
@@ -373,30 +424,19 @@ class Chatroom:
     ) -> Optional[list[Message]]:
         """Get messages by time (since) or count"""
 
-        if channel is not None:
-            self.active_channel = channel
+        channel_uid = self._resolve_channel(channel).uid
 
-        elif self.active_channel is None:
-            raise ValueError(
-                "Please use either the Chatroom.set_channel() function"
-                + " or provide `channel` as a non-null value!"
-            )
-
-        else:
-            channel = self.active_channel
+        # Messages before a fixed time are history, which doesn't change
+        if method == "count" and time is not None:
+            try:
+                return list(self._get_history(channel_uid, count, time))
 
-        headers = {
-            "get-method": method,
-            "userID": self.user_id,
-            "channelID": channel.uid,
-            "count": count,
-            "time": time,
-        }
+            except _UncachedResult:
+                # Getting messages failed, but error was captured
+                return None
 
-        messages = self._request(
-            "get",
-            url=self.endpoints.messages,
-            headers=headers,
+        messages = self._get(
+            **self._get_messages_args(method, channel_uid, count, time)
         )
 
         if messages is None:
@@ -405,34 +445,50 @@ class Chatroom:
 
         return [Message.from_dict(message) for message in messages]
 
+    def _fetch_history(
+        self, channel_uid: str, count: Optional[str], time: str
+    ) -> tuple[Message, ...]:
+        """Get `count` messages sent before `time`, cached as `_get_history`"""
+
+        messages = self._get(
+            **self._get_messages_args("count", channel_uid, count, time)
+        )
+
+        if messages is None:
+            # Raising keeps the failed request out of the cache
+            raise _UncachedResult
+
+        return tuple(Message.from_dict(message) for message in messages)
+
     def subscribe(self, event: Event, callback: EventCallback) -> None:
         """Listen for event and run callback"""
 
-        self._listeners[event] = callback
+        self._set_listener(event, callback)
 
         if not self._is_looping and not event in [Event.ERROR, Event.NETWORK_EXCEPTION]:
             self._run()
 
     def stop(self) -> None:
-        """Stop event loop"""
+        """Stop event loop, wait for its thread to finish"""
+
+        self._stop.set()
+        self._wake.set()
+
+        if self._teacup is not None:
+            self._teacup._unregister(self)  # pylint: disable=protected-access
 
-        self._is_stopped = True
+        thread = self.event_thread
+        if thread.is_alive() and thread is not current_thread():
+            thread.join()
+
+        # The executor of a Teacup's chatroom is shut down by the Teacup
+        if self._teacup is None:
+            self._executor.shutdown(wait=False)
 
     def create(self, username: str, password: str) -> Optional[Chatroom]:
         """Create chatroom on the server"""
 
-        data = {
-            "chatroom_name": self.name,
-            "username": username,
-            "password": password,
-        }
-
-        response = self._request(
-            "post",
-            headers={"Content-Type": "application/json"},
-            url=self.endpoints.chatroom,
-            json=data,
-        )
+        response = self._post(**self._create_args(username, password))
 
         if response is None:
             # Creation did not succeed, but error was captured
@@ -444,12 +500,7 @@ class Chatroom:
     def create_channel(self, name: str) -> Optional[Channel]:
         """Create a channel"""
 
-        data = {
-            "userID": self.user_id,
-            "channel_name": name,
-        }
-
-        response = self._request("post", url=self.endpoints.channels, json=data)
+        response = self._post(**self._create_channel_args(name))
 
         if response is None:
             # Creation of chatroom failed, but error was captured
@@ -475,7 +526,7 @@ class Chatroom:
         if expiration_time is not None:
             headers["expiration-time"] = str(expiration_time)
 
-        response = self._request("get", url=self.endpoints.invites, headers=headers)
+        response = self._get(url=self.endpoints.invites, headers=headers)
 
         if response is None:
             return None
@@ -495,7 +546,7 @@ class Chatroom:
             "password": password,
         }
 
-        response = self._request("post", url=self.endpoints.invites, json=data)
+        response = self._post(**self._json_args(self.endpoints.invites, data))
 
         if response is None:
             return None
@@ -507,8 +558,7 @@ class Chatroom:
     def get_users(self) -> Optional[list[User]]:
         """Get all users in a chatroom"""
 
-        users = self._request(
-            "get",
+        users = self._get(
             data={"userID": self.uid},
         )
 
@@ -521,11 +571,7 @@ class Chatroom:
     def get_channels(self) -> Optional[list[Channel]]:
         """Get all channels the logged-in user has access to"""
 
-        channels = self._request(
-            "get",
-            url=self.endpoints.channels,
-            headers={"userID": self.user_id},
-        )
+        channels = self._get(**self._get_channels_args())
 
         if channels is None:
             # Getting channels failed, but error was captured
@@ -538,16 +584,7 @@ class Chatroom:
 
         Temporary: user_id will be replaced with username"""
 
-        data = {
-            "userID": user_id,
-            "password": password,
-        }
-
-        response = self._request(
-            "post",
-            url=self.endpoints.login,
-            json=data,
-        )
+        response = self._post(**self._login_args(user_id, password))
 
         self.user_id = user_id
         self._update_channels()
@@ -570,14 +607,20 @@ class Chatroom:
         )
 
     def get_count(
-        self, count: int, channel: Optional[Channel] = None
+        self,
+        count: int,
+        channel: Optional[Channel] = None,
+        before: Optional[float] = None,
     ) -> Optional[list[Message]]:
-        """Get `count` messages timestamp"""
+        """Get `count` messages, optionally only ones sent before epoch timestamp `before`
+
+        Results with `before` given are cached, as past messages don't change."""
 
         return self._get_messages(
             "count",
             channel,
             str(count),
+            None if before is None else str(before),
         )
 
     def send(
@@ -591,33 +634,9 @@ class Chatroom:
         The message type is detected automatically, so sending files & text
         is done through the same method."""
 
-        msg = {}
-        if channel is not None:
-            self.active_channel = channel
-
-        elif self.active_channel is None:
-            raise ValueError(
-                "Please use either the Chatroom.set_channel() function"
-                + " or provide `channel` as a non-null value!"
-            )
-
-        if isinstance(content, bytes):
-            endpoint = self.endpoints.files
-        else:
-            endpoint = self.endpoints.messages
-
-        msg = {
-            "userID": self.user_id,
-            "channelID": self.active_channel.uid,
-            "replyID": reply_id,
-            "data": content,
-        }
+        sent = self._post(**self._send_args(content, channel, reply_id))
 
-        sent = self._request(
-            "post",
-            url=endpoint,
-            json=msg,
-        )
+        self._wake_up()
 
         # In the future, `sent` will be a full message, and the client loop
         # will emit the `MSG_NEW` event with it as the data.
@@ -629,21 +648,103 @@ class Chatroom:
 class Teacup:
     """TODO"""
 
-    def __init__(self) -> None:
-        """Initialize object"""
+    def __init__(
+        self,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: RequestTimeout = DEFAULT_TIMEOUT,
+    ) -> None:
+        """Initialize object
+
+        All chatrooms of a Teacup share one session, and thus one connection pool.
+        `max_workers` sets the number of worker threads used by `Teacup.thread`,
+        `timeout` is passed on to every chatroom."""
 
+        self.timeout = timeout
         self.chatrooms: list[Chatroom] = []
         self._global_listeners: dict[Event, EventCallback] = {}
+        self._session = _create_session(pool_maxsize)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._poll_executor = ThreadPoolExecutor(max_workers=POLL_WORKERS)
+
+        self._polling: list[Chatroom] = []
+        self._stop = ThreadEvent()
+        self._wake = ThreadEvent()
+        self._scheduler_thread = Thread(target=self._schedule, name="Teacup scheduler")
+
+    def _register(self, chatroom: Chatroom) -> None:
+        """Add chatroom to the ones polled by the scheduler, start it if needed"""
+
+        # Replaced rather than mutated, as the scheduler may be iterating it
+        self._polling = [*self._polling, chatroom]
+        self._wake.set()
+
+        if self._scheduler_thread.ident is None:
+            self._scheduler_thread.start()
+
+    def _unregister(self, chatroom: Chatroom) -> None:
+        """Remove chatroom from the ones polled by the scheduler"""
+
+        self._polling = [other for other in self._polling if other is not chatroom]
+
+    def _schedule(self) -> None:
+        """Poll all due chatrooms one after another from a single thread
+
+        A chatroom whose poll raises is reported through `threading.excepthook`
+        & stopped, the others keep being polled."""
+
+        # pylint: disable=protected-access
+
+        while not self._stop.is_set():
+            self._wake.clear()
+
+            for chatroom in self._polling:
+                if chatroom._next_poll > monotonic():
+                    continue
+
+                try:
+                    chatroom._backoff(chatroom._poll_once())
+
+                except Exception as exception:  # pylint: disable=broad-except
+                    # Looked up on each call, so hooks set by the application apply
+                    threading.excepthook(
+                        threading.ExceptHookArgs(
+                            (
+                                type(exception),
+                                exception,
+                                exception.__traceback__,
+                                current_thread(),
+                            )
+                        )
+                    )
+                    chatroom.stop()
+
+            polling = self._polling
+            next_poll = min((chatroom._next_poll for chatroom in polling), default=None)
+            if next_poll is None:
+                self._wake.wait()
+                continue
+
+            self._wake.wait(max(0.0, next_poll - monotonic()))
 
     def get_threads(self) -> list[str]:
-        """Get names of all chatroom threads"""
+        """Get names of all running chatroom threads"""
 
-        return [chatroom.event_thread.name for chatroom in self.chatrooms]
+        threads = [self._scheduler_thread]
+        threads += [chatroom.event_thread for chatroom in self.chatrooms]
+
+        return [thread.name for thread in threads if thread.is_alive()]
 
     def login(self, username: str, password: str, chatroom: str, url: str) -> Chatroom:
         """Create a logged-in chatroom instance"""
 
-        chat = Chatroom(url=url, uid=chatroom)
+        chat = Chatroom(
+            url=url,
+            uid=chatroom,
+            session=self._session,
+            timeout=self.timeout,
+            teacup=self,
+        )
 
         for event, callback in self._global_listeners.items():
             chat.subscribe(event, callback)
@@ -656,9 +757,24 @@ class Teacup:
     def stop(self) -> None:
         """Stop all chatroom threads"""
 
+        self._stop.set()
+        self._wake.set()
+
+        # The scheduler has to finish before the executor it uses is shut down
+        thread = self._scheduler_thread
+        if thread.is_alive() and thread is not current_thread():
+            thread.join()
+
         for chatroom in self.chatrooms:
             chatroom.stop()
 
+        self._poll_executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        """Close the shared session & its pooled connections"""
+
+        self._session.close()
+
     def get_chatroom(self, name: str) -> Optional[Chatroom]:
         """Get first chatroom by matching name"""
 
@@ -673,7 +789,13 @@ class Teacup:
     ) -> Optional[Chatroom]:
         """Create a new chatroom with given user as its owner, return a logged-in instance"""
 
-        chat = Chatroom(url=url, name=name)
+        chat = Chatroom(
+            url=url,
+            name=name,
+            session=self._session,
+            timeout=self.timeout,
+            teacup=self,
+        )
 
         # Subscribe chatroom to all global events we are subscribed to
         for event, callback in self._global_listeners.items():
@@ -691,7 +813,13 @@ class Teacup:
     ) -> Optional[Chatroom]:
         """Use invite to get a chatroom"""
 
-        chat = Chatroom(url=invite.url, uid=invite.chatroom_id)
+        chat = Chatroom(
+            url=invite.url,
+            uid=invite.chatroom_id,
+            session=self._session,
+            timeout=self.timeout,
+            teacup=self,
+        )
         if chat.create_from_invite(invite, username, password) is None:
             # Creation failed, but error was captured
             return None
@@ -705,36 +833,36 @@ class Teacup:
         for chatroom in self.chatrooms:
             chatroom.subscribe(event, callback)
 
-        self._global_listeners[event] = callback
+        # Replaced rather than mutated, as other threads may be iterating it
+        self._global_listeners = {**self._global_listeners, event: callback}
 
-    @staticmethod
     def thread(
+        self,
         target: Callable[..., Any],
         callback: Callable[..., Any],
         target_args: Optional[tuple[Any, ...]] = None,
         target_kwargs: Optional[dict[str, Any]] = None,
-    ) -> None:
-        """Run target(*target_args, **target_kwargs) in a thread, call callback with its result
+    ) -> Future:
+        """Run target(*target_args, **target_kwargs) in a worker, call callback with its result
 
-        Note: the signature of the callback function depends on the thread's target."""
+        Note: the signature of the callback function depends on the thread's target.
+        If target raises, callback is not called and the exception is available
+        from the returned Future."""
 
-        args: tuple[Any, ...]
-        kwargs: dict[str, Any]
+        def _on_done(future: Future) -> None:
+            """Call callback with the result of a successful target"""
 
-        if target_args is None:
-            args = ()
-        else:
-            args = target_args
+            if future.exception() is None:
+                callback(future.result())
 
-        if target_kwargs is None:
-            kwargs = {}
-        else:
-            kwargs = {}
+        future = self._executor.submit(
+            target, *(target_args or ()), **(target_kwargs or {})
+        )
+        future.add_done_callback(_on_done)
 
-        def _inner() -> None:
-            """The wrapper that calls target & callback"""
+        return future
 
-            callback(target(*args, **kwargs))
+    def shutdown(self) -> None:
+        """Shut down the worker threads used by `Teacup.thread`"""
 
-        runner = Thread(target=_inner)
-        runner.start()
+        self._executor.shutdown(wait=False)